@@ -12,21 +12,62 @@ Adds:
     - archive_rate (size_bytes / duration_archive)
     - upload_rate (size_bytes / duration_upload)
     - volumes_rate (volume_bytes / duration_volumes)
-- /api/import returns inserted_count so the UI can show "X new datapoints"
+- Stats are read from a daily_summary table kept up to date by the importer
+- /api/import queues an import on the background writer and returns 202
 - /api/failures returns last 10 failed backups with error details
 - /api/failure-trends returns failure counts grouped by category and week
 """
 
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request
 import sqlite3
+import functools
+import hashlib
 import json
 import os
+import queue
 import threading
 import time
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import Optional
+
+try:
+    import orjson
+    json_loads = orjson.loads  # parses bytes directly, no decode step
+    json_dumps = orjson.dumps
+except ImportError:
+    orjson = None
+    json_loads = json.loads
+    json_dumps = lambda obj: json.dumps(obj).encode()
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
 
 app = Flask(__name__)
 
+# br/gzip/deflate for HTML and JSON bodies over 500 bytes, when the client
+# accepts it. Streamed bodies (/api/metrics on a cache miss) use a separate
+# list, which can't include gzip and would otherwise default to zstd first.
+if Compress is not None:
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip', 'deflate']
+    app.config['COMPRESS_ALGORITHM_STREAMING'] = ['br', 'deflate']
+    app.config['COMPRESS_MIN_SIZE'] = 500
+    Compress(app)
+
+# Static files are versioned in their URLs (see _static_version), so browsers
+# can keep them for a year
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 365 * 24 * 60 * 60
+
 # ----------------------------
 # Config
 # ----------------------------
@@ -63,24 +104,112 @@ METRICS_FILE = os.getenv('METRICS_FILE', '/data/metrics.jsonl')
 os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
 os.makedirs(os.path.dirname(METRICS_FILE), exist_ok=True)
 
+STATS_WINDOW_DAYS = 30
+
+@dataclass(frozen=True)
+class Windows:
+    """Time-window boundaries in epoch seconds, computed fresh at each use."""
+    cutoff_epoch: int       # rows older than this fall outside RETENTION_DAYS
+    thirty_day_epoch: int   # start of the dashboard's 30-day window
+
+    @classmethod
+    def compute(cls) -> 'Windows':
+        now = int(time.time())
+        return cls(
+            cutoff_epoch=now - RETENTION_DAYS * 86400,
+            thirty_day_epoch=now - STATS_WINDOW_DAYS * 86400,
+        )
+
 # ----------------------------
 # DB schema + migration helpers
 # ----------------------------
+# Per-connection tuning. journal_mode=WAL is persisted in the DB file and is
+# set once per process by _connect(); these apply to each new connection.
+CONNECTION_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',     # WAL + NORMAL: one fsync per checkpoint, not per commit
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-20000',      # ~20 MB page cache (negative = KiB)
+    'PRAGMA mmap_size=268435456',    # 256 MB mmap window
+)
+
+def _apply_pragmas(conn: sqlite3.Connection):
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+_wal_enabled = False
+
+def _connect(read_only: bool = False, autocommit: bool = True) -> sqlite3.Connection:
+    """Open a tuned connection to DB_PATH. All connections go through here.
+
+    read_only opens with mode=ro. autocommit=False keeps sqlite3's implicit
+    transactions (used by init_db); otherwise transactions are explicit.
+    """
+    global _wal_enabled
+    if read_only:
+        conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+    else:
+        conn = sqlite3.connect(DB_PATH, isolation_level=None if autocommit else '')
+        if not _wal_enabled:
+            # WAL lets the dashboard routes read while the importer writes
+            conn.execute('PRAGMA journal_mode=WAL')
+            _wal_enabled = True
+    _apply_pragmas(conn)
+    return conn
+
+# One cached connection per thread: a read-only handle for the routes and a
+# separate read-write handle for the importer (the single writer thread).
+# A connection never leaves the thread that opened it, so sqlite3's
+# same-thread check stays on. Never closed explicitly; a connection is
+# released with its thread.
+_tls = threading.local()
+
+def get_ro_conn() -> sqlite3.Connection:
+    """Return this thread's read-only connection (rows are sqlite3.Row), opening it on first use."""
+    conn = getattr(_tls, 'conn', None)
+    if conn is None:
+        conn = _connect(read_only=True)
+        conn.row_factory = sqlite3.Row
+        _tls.conn = conn
+    return conn
+
+def get_rw_conn() -> sqlite3.Connection:
+    """Return this thread's writer connection (autocommit; transactions are explicit)."""
+    conn = getattr(_tls, 'rw_conn', None)
+    if conn is None:
+        _tls.rw_conn = conn = _connect()
+    return conn
+
+# Non-unique indexes on backups. The importer drops and rebuilds these around
+# large loads; the UNIQUE(backup_id) index always stays for INSERT OR IGNORE.
+SECONDARY_INDEXES = (
+    ('idx_ts_epoch', 'CREATE INDEX IF NOT EXISTS idx_ts_epoch ON backups(ts_epoch)'),
+    # Failed rows only, by time: /api/failures walks it newest first
+    ('idx_failures', 'CREATE INDEX IF NOT EXISTS idx_failures ON backups(ts_epoch) WHERE success = 0'),
+    # Failed rows only, keyed by week bucket: covers the /api/failure-trends GROUP BY
+    ('idx_week_category', 'CREATE INDEX IF NOT EXISTS idx_week_category '
+                          'ON backups(week, error_category, ts_epoch) WHERE success = 0'),
+)
+
+# Generated week bucket for failure trends. VIRTUAL because ALTER TABLE cannot
+# add STORED columns; idx_week_category materializes it for failed rows.
+WEEK_COLUMN_DEF = "week TEXT GENERATED ALWAYS AS (strftime('%Y-%W', ts_epoch, 'unixepoch')) VIRTUAL"
+
 def _col_exists(conn: sqlite3.Connection, table: str, col: str) -> bool:
     c = conn.cursor()
-    c.execute(f"PRAGMA table_info({table})")
+    c.execute(f"PRAGMA table_xinfo({table})")  # xinfo also lists generated columns
     cols = [r[1] for r in c.fetchall()]  # r[1] is column name
     return col in cols
 
 def init_db():
     """Initialize SQLite database and auto-migrate schema changes."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = _connect(autocommit=False)
     c = conn.cursor()
 
-    c.execute('''
+    c.execute(f'''
         CREATE TABLE IF NOT EXISTS backups (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT NOT NULL,
+            ts_epoch INTEGER,
             backup_id TEXT NOT NULL UNIQUE,
             success INTEGER NOT NULL,
             duration_total INTEGER NOT NULL,
@@ -92,10 +221,38 @@ def init_db():
             volume_bytes INTEGER DEFAULT 0,
             error_category TEXT,
             error_message TEXT,
-            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            {WEEK_COLUMN_DEF}
+        )
+    ''')
+
+    # Small key/value store for importer state (e.g. last JSONL offset)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+
+    # Per-day aggregates behind get_stats(), maintained by the importer
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS daily_summary (
+            day TEXT PRIMARY KEY,
+            count INTEGER NOT NULL,
+            successful INTEGER NOT NULL,
+            sum_duration INTEGER NOT NULL,
+            min_duration INTEGER,
+            max_duration INTEGER,
+            sum_size INTEGER NOT NULL,
+            sum_overall_bps REAL NOT NULL,
+            sum_archive_bps REAL NOT NULL,
+            n_archive INTEGER NOT NULL,
+            sum_upload_bps REAL NOT NULL,
+            n_upload INTEGER NOT NULL,
+            sum_volumes_bps REAL NOT NULL,
+            n_volumes INTEGER NOT NULL
         )
     ''')
-    c.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON backups(timestamp)')
     conn.commit()
 
     # Auto-migrate older DBs
@@ -109,313 +266,786 @@ def init_db():
             print(f"Migrating DB: adding column backups.{col_name}")
             c.execute(f'ALTER TABLE backups ADD COLUMN {col_def}')
             conn.commit()
+    if not _col_exists(conn, "backups", "ts_epoch"):
+        # Filters and sorting use integer epoch seconds; the ISO text column
+        # is kept for display and is slated for removal.
+        print("Migrating DB: adding column backups.ts_epoch")
+        c.execute('ALTER TABLE backups ADD COLUMN ts_epoch INTEGER')
+        c.execute('SELECT id, timestamp FROM backups')
+        c.executemany('UPDATE backups SET ts_epoch = ? WHERE id = ?',
+                      [(_to_epoch(ts), row_id) for row_id, ts in c.fetchall()])
+        conn.commit()
+
+    if not _col_exists(conn, "backups", "week"):
+        print("Migrating DB: adding generated column backups.week")
+        c.execute(f'ALTER TABLE backups ADD COLUMN {WEEK_COLUMN_DEF}')
+        conn.commit()
+
+    # Indexes on the TEXT timestamp, superseded by the ts_epoch ones
+    c.execute('DROP INDEX IF EXISTS idx_timestamp')
+    c.execute('DROP INDEX IF EXISTS idx_success_ts')
+    # Full (success, ts_epoch) index, superseded by the partial idx_failures
+    c.execute('DROP INDEX IF EXISTS idx_success_epoch')
+    for _, create_sql in SECONDARY_INDEXES:
+        c.execute(create_sql)
+    conn.commit()
+
+    # Older DBs have rows but no summary yet
+    c.execute('SELECT NOT EXISTS (SELECT 1 FROM daily_summary) AND EXISTS (SELECT 1 FROM backups)')
+    if c.fetchone()[0]:
+        print("Migrating DB: building daily_summary")
+        rebuild_daily_summary(conn)
+        conn.commit()
+
+    # Planner statistics, so it can pick between the overlapping indexes.
+    # analysis_limit samples each index instead of reading it in full.
+    c.execute('PRAGMA analysis_limit = 1000')
+    c.execute('ANALYZE')
+    conn.commit()
 
     conn.close()
 
+def get_meta(conn: sqlite3.Connection, key: str):
+    row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+    return row[0] if row else None
+
+def set_meta(conn: sqlite3.Connection, key: str, value):
+    conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value)))
+
+# ----------------------------
+# Daily summary
+# ----------------------------
+# One row per UTC day over the rows get_stats() counts (duration_total > 0).
+# Rate averages are kept as sum + count so they can be merged across days.
+SUMMARY_COLUMNS = '''
+    day, count, successful, sum_duration, min_duration, max_duration, sum_size,
+    sum_overall_bps, sum_archive_bps, n_archive, sum_upload_bps, n_upload,
+    sum_volumes_bps, n_volumes
+'''
+
+SUMMARY_SELECT = '''
+    SELECT
+        date(ts_epoch, 'unixepoch') AS day,
+        COUNT(*),
+        SUM(success = 1),
+        SUM(duration_total),
+        MIN(duration_total),
+        MAX(duration_total),
+        TOTAL(size_bytes),
+        TOTAL(CAST(size_bytes AS REAL) / duration_total),
+        TOTAL(CASE WHEN duration_archive > 0 THEN CAST(size_bytes AS REAL) / duration_archive END),
+        COUNT(CASE WHEN duration_archive > 0 THEN 1 END),
+        TOTAL(CASE WHEN duration_upload > 0 THEN CAST(size_bytes AS REAL) / duration_upload END),
+        COUNT(CASE WHEN duration_upload > 0 THEN 1 END),
+        TOTAL(CASE WHEN duration_volumes > 0 THEN CAST(volume_bytes AS REAL) / duration_volumes END),
+        COUNT(CASE WHEN duration_volumes > 0 THEN 1 END)
+    FROM backups
+    WHERE duration_total > 0 AND ts_epoch IS NOT NULL AND {where}
+    GROUP BY day
+'''
+
+def add_to_daily_summary(conn: sqlite3.Connection, after_id: int):
+    """Fold rows with id > after_id (i.e. just imported) into daily_summary."""
+    conn.execute(f'''
+        INSERT INTO daily_summary ({SUMMARY_COLUMNS})
+        {SUMMARY_SELECT.format(where='id > ?')}
+        ON CONFLICT(day) DO UPDATE SET
+            count = count + excluded.count,
+            successful = successful + excluded.successful,
+            sum_duration = sum_duration + excluded.sum_duration,
+            min_duration = MIN(min_duration, excluded.min_duration),
+            max_duration = MAX(max_duration, excluded.max_duration),
+            sum_size = sum_size + excluded.sum_size,
+            sum_overall_bps = sum_overall_bps + excluded.sum_overall_bps,
+            sum_archive_bps = sum_archive_bps + excluded.sum_archive_bps,
+            n_archive = n_archive + excluded.n_archive,
+            sum_upload_bps = sum_upload_bps + excluded.sum_upload_bps,
+            n_upload = n_upload + excluded.n_upload,
+            sum_volumes_bps = sum_volumes_bps + excluded.sum_volumes_bps,
+            n_volumes = n_volumes + excluded.n_volumes
+    ''', (after_id,))
+
+def rebuild_daily_summary(conn: sqlite3.Connection, from_epoch: int = 0, to_epoch: Optional[int] = None):
+    """Recompute daily_summary from backups for the UTC days containing
+    from_epoch through to_epoch (default: every later day)."""
+    # UTC day boundaries, matching date(ts_epoch, 'unixepoch')
+    params = [from_epoch - from_epoch % 86400]
+    day_where = "day >= date(?, 'unixepoch')"
+    row_where = 'ts_epoch >= ?'
+    if to_epoch is not None:
+        params.append(to_epoch - to_epoch % 86400 + 86400)
+        day_where += " AND day < date(?, 'unixepoch')"
+        row_where += ' AND ts_epoch < ?'
+    conn.execute(f'DELETE FROM daily_summary WHERE {day_where}', params)
+    conn.execute(f'''
+        INSERT INTO daily_summary ({SUMMARY_COLUMNS})
+        {SUMMARY_SELECT.format(where=row_where)}
+    ''', params)
+
 # ----------------------------
 # Import
 # ----------------------------
+INSERT_SQL = '''
+    INSERT OR IGNORE INTO backups
+    (timestamp, ts_epoch, backup_id, success, duration_total, duration_snapshot,
+     duration_archive, duration_volumes, duration_upload, size_bytes,
+     volume_bytes, error_category, error_message)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Rows per executemany() call; bounds memory while streaming large files
+IMPORT_CHUNK_SIZE = 10_000
+
+# Read buffer for the metrics file (default is 8 KiB); fewer read() syscalls on big files
+IMPORT_READ_BUFFER_BYTES = 1 << 20
+
+# SQLite INTEGER range; anything outside would fail the whole executemany()
+SQLITE_INT_MIN = -2 ** 63
+SQLITE_INT_MAX = 2 ** 63 - 1
+
+def _as_int(value) -> Optional[int]:
+    """int(value), or None if it can't be converted or doesn't fit an SQLite
+    INTEGER. JSON ints skip the conversion."""
+    if type(value) is not int:
+        try:
+            value = int(value)
+        except (TypeError, ValueError, OverflowError):
+            return None
+    if SQLITE_INT_MIN <= value <= SQLITE_INT_MAX:
+        return value
+    return None
+
+def _to_epoch(ts) -> Optional[int]:
+    """ISO 8601 timestamp or epoch seconds -> epoch seconds (naive ISO values
+    are local time), or None."""
+    try:
+        if type(ts) is int or type(ts) is float:
+            # Range check: rejects e.g. millisecond timestamps
+            datetime.fromtimestamp(ts)
+            return int(ts)
+        if isinstance(ts, str):
+            return int(datetime.fromisoformat(ts).timestamp())
+    except (ValueError, OverflowError, OSError):
+        pass
+    return None
+
+def parse_line(line) -> Optional[tuple]:
+    """Parse one JSONL line into a backups row tuple, or None if it isn't a valid record.
+
+    Only JSON syntax errors raise (and are caught) here; schema problems are
+    plain checks so the common path never sets up an exception.
+    """
+    try:
+        data = json_loads(line)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    # Required fields
+    if 'timestamp' not in data or 'backup_id' not in data or 'success' not in data:
+        return None
+    backup_id = data['backup_id']
+    if not isinstance(backup_id, str):
+        return None
+    timestamp = data['timestamp']
+    ts_epoch = _to_epoch(timestamp)
+    if ts_epoch is None:
+        return None
+    if not isinstance(timestamp, str):
+        # Epoch input: keep an ISO string for display like every other row
+        timestamp = datetime.fromtimestamp(ts_epoch).astimezone().isoformat()
+    success = data['success']
+    duration_total = _as_int(data.get('duration_total'))
+    size_bytes = _as_int(data.get('size_bytes'))
+    if duration_total is None or size_bytes is None:
+        return None
+
+    # Optional fields
+    duration_snapshot = _as_int(data.get('duration_snapshot') or 0)
+    duration_archive = _as_int(data.get('duration_archive') or 0)
+    duration_volumes = _as_int(data.get('duration_volumes') or 0)
+    duration_upload = _as_int(data.get('duration_upload') or 0)
+    volume_bytes = _as_int(data.get('volume_bytes') or 0)
+    if None in (duration_snapshot, duration_archive, duration_volumes, duration_upload, volume_bytes):
+        return None
+
+    # Error tracking (only meaningful when success=false)
+    error_category = None
+    error_message = None
+    if not success:
+        error_category = data.get('error_category', 'unknown')
+        error_message = data.get('error_message')
+        if not (error_category is None or isinstance(error_category, str)):
+            return None
+        if not (error_message is None or isinstance(error_message, str)):
+            return None
+
+    return (
+        timestamp,
+        ts_epoch,
+        backup_id,
+        1 if success else 0,
+        duration_total,
+        duration_snapshot,
+        duration_archive,
+        duration_volumes,
+        duration_upload,
+        size_bytes,
+        volume_bytes,
+        error_category,
+        error_message
+    )
+
+def _iter_rows(f):
+    """Yield one backups row tuple per valid JSONL line, skipping bad lines."""
+    skipped = 0
+    for line in f:
+        if len(line) <= 1:
+            continue
+        row = parse_line(line)
+        if row:
+            yield row
+        else:
+            skipped += 1
+    if skipped:
+        print(f"Skipped {skipped} invalid metrics line(s)")
+
+def _iter_complete_lines(f):
+    """Yield newline-terminated lines. A trailing partial line (writer still
+    appending) is left unread so the next import picks it up whole."""
+    for line in f:
+        if not line.endswith(b'\n'):
+            f.seek(-len(line), os.SEEK_CUR)
+            return
+        yield line
+
 def import_metrics() -> int:
     """Import metrics from JSONL file into SQLite. Returns number of newly inserted rows."""
-    if not os.path.exists(METRICS_FILE):
+    try:
+        f = open(METRICS_FILE, 'rb', buffering=IMPORT_READ_BUFFER_BYTES)
+    except FileNotFoundError:
         return 0
 
-    inserted = 0
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+    with f:
+        # Metadata of the file actually opened, so a rotation right now can't
+        # pair the old inode with an offset into the new file
+        st = os.fstat(f.fileno())
+
+        conn = get_rw_conn()
+        c = conn.cursor()
+
+        offset = int(get_meta(conn, 'last_offset') or 0)
+        last_inode = get_meta(conn, 'last_inode')
+
+        # Untouched since the last import: nothing to do. mtime alone isn't enough,
+        # as an append can land in the same (coarse) mtime tick as the last import.
+        if (get_meta(conn, 'last_mtime') == str(st.st_mtime_ns)
+                and st.st_size == offset and last_inode == str(st.st_ino)):
+            return 0
+
+        # Only parse bytes appended since the last import. If the file was
+        # replaced (rotated) or shrank (trimmed), start over from the beginning.
+        if last_inode is not None and last_inode != str(st.st_ino):
+            print("Metrics file was replaced, re-importing from start")
+            offset = 0
+        elif st.st_size < offset:
+            print(f"Metrics file shrank below last offset ({offset}), re-importing from start")
+            offset = 0
+
+        # executemany() does not report per-row rowcount for INSERT OR IGNORE,
+        # so count new rows via the connection's change counter instead.
+        changes_before = conn.total_changes
+
+        f.seek(offset)
+        rows = _iter_rows(_iter_complete_lines(f))
+        c.execute('BEGIN IMMEDIATE')
+        try:
+            max_id_before = c.execute('SELECT COALESCE(MAX(id), 0) FROM backups').fetchone()[0]
+            chunk = list(islice(rows, IMPORT_CHUNK_SIZE))
+
+            # First import into an empty table, or more than one chunk to load:
+            # building the secondary indexes once at the end is cheaper than
+            # updating them row by row.
+            bulk_load = len(chunk) == IMPORT_CHUNK_SIZE or (bool(chunk) and max_id_before == 0)
+            if bulk_load:
+                for index_name, _ in SECONDARY_INDEXES:
+                    c.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+            # Same INSERT_SQL string every call, so sqlite3 reuses the prepared statement
+            while chunk:
+                c.executemany(INSERT_SQL, chunk)
+                chunk = list(islice(rows, IMPORT_CHUNK_SIZE))
+
+            if bulk_load:
+                for _, create_sql in SECONDARY_INDEXES:
+                    c.execute(create_sql)
+
+            inserted = conn.total_changes - changes_before
+            if inserted:
+                add_to_daily_summary(conn, max_id_before)
+            set_meta(conn, 'last_offset', f.tell())
+            set_meta(conn, 'last_mtime', st.st_mtime_ns)
+            set_meta(conn, 'last_inode', st.st_ino)
+            c.execute('COMMIT')
+        except Exception:
+            c.execute('ROLLBACK')
+            raise
+
+    if bulk_load:
+        # The recreated indexes have lost their planner statistics
+        c.execute('PRAGMA optimize')
+
+    if inserted:
+        invalidate_stats_cache()
+        invalidate_response_cache()
 
-    with open(METRICS_FILE, 'r') as f:
-        for line in f:
-            if not line.strip():
-                continue
-            try:
-                data = json.loads(line)
-
-                # Required fields
-                ts = data['timestamp']
-                backup_id = data['backup_id']
-                success = data['success']
-                duration_total = int(data['duration_total'])
-                size_bytes = int(data['size_bytes'])
-
-                # Optional fields
-                duration_snapshot = int(data.get('duration_snapshot', 0) or 0)
-                duration_archive = int(data.get('duration_archive', 0) or 0)
-                duration_volumes = int(data.get('duration_volumes', 0) or 0)
-                duration_upload = int(data.get('duration_upload', 0) or 0)
-                volume_bytes = int(data.get('volume_bytes', 0) or 0)
-
-                # Error tracking (only meaningful when success=false)
-                error_category = None
-                error_message = None
-                if not success:
-                    error_category = data.get('error_category', 'unknown')
-                    error_message = data.get('error_message')
-
-                c.execute('''
-                    INSERT OR IGNORE INTO backups
-                    (timestamp, backup_id, success, duration_total, duration_snapshot,
-                     duration_archive, duration_volumes, duration_upload, size_bytes,
-                     volume_bytes, error_category, error_message)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    ts,
-                    backup_id,
-                    1 if success else 0,
-                    duration_total,
-                    duration_snapshot,
-                    duration_archive,
-                    duration_volumes,
-                    duration_upload,
-                    size_bytes,
-                    volume_bytes,
-                    error_category,
-                    error_message
-                ))
-
-                if c.rowcount == 1:
-                    inserted += 1
-
-            except (json.JSONDecodeError, KeyError, ValueError) as e:
-                print(f"Skipping invalid line: {e}")
-                continue
+    return inserted
 
-    conn.commit()
+# ----------------------------
+# Retention
+# ----------------------------
+RETENTION_SWEEP_INTERVAL_SECONDS = 24 * 60 * 60
 
-    # Cleanup old records beyond retention
-    cutoff = (datetime.now() - timedelta(days=RETENTION_DAYS)).isoformat()
-    c.execute('DELETE FROM backups WHERE timestamp < ?', (cutoff,))
-    conn.commit()
-    conn.close()
+# Rows deleted per statement, so one sweep never holds the write lock for long
+RETENTION_DELETE_BATCH = 10_000
 
-    return inserted
+RETENTION_DELETE_SQL = '''
+    DELETE FROM backups WHERE rowid IN (
+        SELECT rowid FROM backups WHERE ts_epoch < ? LIMIT ?
+    )
+'''
+
+def retention_sweep(force: bool = False) -> int:
+    """Delete records older than RETENTION_DAYS, at most once a day. Returns rows deleted."""
+    conn = get_rw_conn()
+
+    last_sweep = float(get_meta(conn, 'last_sweep') or 0)
+    if not force and time.time() - last_sweep < RETENTION_SWEEP_INTERVAL_SECONDS:
+        return 0
+
+    cutoff = Windows.compute().cutoff_epoch
+    deleted = 0
+    while True:
+        # Range scan on idx_ts_epoch; each batch commits on its own
+        c = conn.execute(RETENTION_DELETE_SQL, (cutoff, RETENTION_DELETE_BATCH))
+        deleted += c.rowcount
+        if c.rowcount < RETENTION_DELETE_BATCH:
+            break
+
+    # Days before the cutoff are gone and the cutoff day lost part of its rows.
+    # Done on every sweep, not only when this one deleted rows: the deletes
+    # above are already committed, so a failure here must be repaired by the
+    # next attempt. Only the cutoff day is recounted, so this stays cheap.
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        conn.execute("DELETE FROM daily_summary WHERE day < date(?, 'unixepoch')", (cutoff,))
+        rebuild_daily_summary(conn, cutoff, cutoff)
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+    set_meta(conn, 'last_sweep', time.time())
+
+    invalidate_stats_cache()
+    invalidate_response_cache()
+
+    return deleted
 
 # ----------------------------
 # Stats
 # ----------------------------
-def get_stats():
-    """Get summary statistics (last 30 days)."""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+# Data only changes on import, so page views share one recent result.
+# import_metrics() expires it early whenever new rows land.
+STATS_CACHE_TTL_SECONDS = 60
+_stats_cache = {"v": None, "t": 0}
+_stats_lock = threading.Lock()
 
-    thirty_days_ago = (datetime.now() - timedelta(days=30)).isoformat()
+def invalidate_stats_cache():
+    with _stats_lock:
+        _stats_cache["t"] = 0
 
-    c.execute('''
+def get_stats():
+    """Get summary statistics (last 30 days), cached for STATS_CACHE_TTL_SECONDS."""
+    with _stats_lock:
+        if _stats_cache["v"] is not None and time.monotonic() - _stats_cache["t"] < STATS_CACHE_TTL_SECONDS:
+            return _stats_cache["v"]
+
+    stats = _compute_stats()
+    with _stats_lock:
+        _stats_cache["v"] = stats
+        _stats_cache["t"] = time.monotonic()
+    return stats
+
+# Final dashboard values, computed by SQLite: the keys are the column aliases.
+# Whole UTC days, so the window can reach up to a day further back than 30*24h.
+STATS_SQL = '''
+    SELECT
+        total_backups,
+        sum_duration / total_backups AS avg_duration,
+        max_duration,
+        min_duration,
+        CAST(sum_size / total_backups / 1048576 AS INTEGER) AS avg_size_mb,
+        CAST(CAST(successful AS REAL) / total_backups * 100 AS INTEGER) AS success_rate,
+        total_backups - successful AS failed_backups,
+        ROUND(sum_overall_bps / total_backups / 1048576, 2) AS avg_throughput_mb_per_sec,
+        ROUND(sum_overall_bps / total_backups / 1048576, 2) AS avg_overall_mb_per_sec,
+        IFNULL(ROUND(sum_archive_bps / NULLIF(n_archive, 0) / 1048576, 2), 0.0) AS avg_archive_mb_per_sec,
+        IFNULL(ROUND(sum_upload_bps / NULLIF(n_upload, 0) / 1048576, 2), 0.0) AS avg_upload_mb_per_sec,
+        IFNULL(ROUND(sum_volumes_bps / NULLIF(n_volumes, 0) / 1048576, 2), 0.0) AS avg_volumes_mb_per_sec
+    FROM (
         SELECT
-            COUNT(*) as total_backups,
-            AVG(duration_total) as avg_duration,
-            MAX(duration_total) as max_duration,
-            MIN(duration_total) as min_duration,
-            AVG(size_bytes) as avg_size,
-            SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END) as successful,
-
-            -- overall throughput (bytes/sec): size_bytes / duration_total
-            AVG(CASE WHEN duration_total > 0
-                THEN CAST(size_bytes AS REAL) / duration_total
-            END) as avg_overall_bps,
-
-            -- archive "processing" rate (bytes/sec): size_bytes / duration_archive
-            AVG(CASE WHEN duration_archive > 0
-                THEN CAST(size_bytes AS REAL) / duration_archive
-            END) as avg_archive_bps,
-
-            -- upload rate (bytes/sec): size_bytes / duration_upload
-            AVG(CASE WHEN duration_upload > 0
-                THEN CAST(size_bytes AS REAL) / duration_upload
-            END) as avg_upload_bps,
-
-            -- volumes rate (bytes/sec): volume_bytes / duration_volumes
-            AVG(CASE WHEN duration_volumes > 0
-                THEN CAST(volume_bytes AS REAL) / duration_volumes
-            END) as avg_volumes_bps
-
-        FROM backups
-        WHERE timestamp >= ? AND duration_total > 0
-    ''', (thirty_days_ago,))
-
-    row = c.fetchone()
-    conn.close()
-
-    if row and row[0]:
-        total_backups = row[0]
-        successful = row[5] or 0
-        failed = total_backups - successful
-
-        def bps_to_mbps(bps):
-            return round((bps / 1024 / 1024), 2) if bps else 0.0
-
-        return {
-            'total_backups': total_backups,
-            'avg_duration': int(row[1]) if row[1] else 0,
-            'max_duration': row[2] or 0,
-            'min_duration': row[3] or 0,
-            'avg_size_mb': int((row[4] or 0) / 1024 / 1024),
-            'success_rate': int((successful / total_backups) * 100) if total_backups else 0,
-            'failed_backups': failed,
-
-            'avg_throughput_mb_per_sec': bps_to_mbps(row[6]),
-            'avg_overall_mb_per_sec': bps_to_mbps(row[6]),
-            'avg_archive_mb_per_sec': bps_to_mbps(row[7]),
-            'avg_upload_mb_per_sec': bps_to_mbps(row[8]),
-            'avg_volumes_mb_per_sec': bps_to_mbps(row[9]),
-        }
-
-    return {
-        'total_backups': 0,
-        'avg_duration': 0,
-        'max_duration': 0,
-        'min_duration': 0,
-        'avg_size_mb': 0,
-        'success_rate': 0,
-        'failed_backups': 0,
-        'avg_throughput_mb_per_sec': 0.0,
-        'avg_overall_mb_per_sec': 0.0,
-        'avg_archive_mb_per_sec': 0.0,
-        'avg_upload_mb_per_sec': 0.0,
-        'avg_volumes_mb_per_sec': 0.0,
-    }
+            SUM(count) AS total_backups,
+            SUM(sum_duration) AS sum_duration,
+            MAX(max_duration) AS max_duration,
+            MIN(min_duration) AS min_duration,
+            TOTAL(sum_size) AS sum_size,
+            SUM(successful) AS successful,
+            TOTAL(sum_overall_bps) AS sum_overall_bps,
+            TOTAL(sum_archive_bps) AS sum_archive_bps,
+            SUM(n_archive) AS n_archive,
+            TOTAL(sum_upload_bps) AS sum_upload_bps,
+            SUM(n_upload) AS n_upload,
+            TOTAL(sum_volumes_bps) AS sum_volumes_bps,
+            SUM(n_volumes) AS n_volumes
+        FROM daily_summary
+        WHERE day >= date(?, 'unixepoch')
+    )
+    WHERE total_backups > 0
+'''
+
+EMPTY_STATS = {
+    'total_backups': 0,
+    'avg_duration': 0,
+    'max_duration': 0,
+    'min_duration': 0,
+    'avg_size_mb': 0,
+    'success_rate': 0,
+    'failed_backups': 0,
+    'avg_throughput_mb_per_sec': 0.0,
+    'avg_overall_mb_per_sec': 0.0,
+    'avg_archive_mb_per_sec': 0.0,
+    'avg_upload_mb_per_sec': 0.0,
+    'avg_volumes_mb_per_sec': 0.0,
+}
+
+def _compute_stats():
+    """Summary statistics (last 30 days) from daily_summary, ready to render."""
+    thirty_days_ago = Windows.compute().thirty_day_epoch
+    row = get_ro_conn().execute(STATS_SQL, (thirty_days_ago,)).fetchone()
+    return dict(row) if row else dict(EMPTY_STATS)
 
 # ----------------------------
 # Routes
 # ----------------------------
+def json_response(payload):
+    """JSON response serialized with orjson, or Flask's jsonify if it's not installed."""
+    if orjson is None:
+        return jsonify(payload)
+    return app.response_class(orjson.dumps(payload), mimetype='application/json')
+
+# Serialized bodies of the cacheable API routes: path -> (etag, body, cached_at).
+# Entries younger than RESPONSE_CACHE_TTL_SECONDS are served without touching
+# SQLite; older ones are revalidated against the data version.
+RESPONSE_CACHE_TTL_SECONDS = 60
+_response_cache = {}
+
+def invalidate_response_cache():
+    _response_cache.clear()
+
+def _data_etag(path: str) -> str:
+    """ETag for path from the current data version (O(1) rowid lookups) and the day."""
+    row = get_ro_conn().execute('SELECT MAX(id), MIN(id) FROM backups').fetchone()
+    version = f"{path}:{row[0]}:{row[1]}:{int(time.time()) // 86400}"
+    return hashlib.md5(version.encode()).hexdigest()
+
+def _tee_into_cache(path: str, etag: str, chunks):
+    """Pass a streamed body through to the client, caching it once complete."""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    _response_cache[path] = (etag, b''.join(parts), time.monotonic())
+
+def _matching_etag(etag: str) -> Optional[str]:
+    """The If-None-Match tag that refers to etag, if any. Flask-Compress sends
+    compressed bodies as "<etag>:<algorithm>", so that suffix is ignored."""
+    for tag in request.if_none_match.as_set():
+        if tag.split(':', 1)[0] == etag:
+            return tag
+    return None
+
+def cached_json(view):
+    """Cache a JSON route's body and answer If-None-Match with 304 Not Modified."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        path = request.path
+        now = time.monotonic()
+        entry = _response_cache.get(path)
+        if entry and now - entry[2] < RESPONSE_CACHE_TTL_SECONDS:
+            etag, body = entry[0], entry[1]
+        else:
+            etag = _data_etag(path)
+            body = entry[1] if entry and entry[0] == etag else None
+            if body is not None:
+                _response_cache[path] = (etag, body, now)
+
+        matched = _matching_etag(etag)
+        if matched:
+            response = app.response_class(status=304)
+        elif body is not None:
+            response = app.response_class(body, mimetype='application/json')
+        else:
+            response = view(*args, **kwargs)
+            if response.is_streamed:
+                response.response = _tee_into_cache(path, etag, response.response)
+            else:
+                _response_cache[path] = (etag, response.get_data(), now)
+        response.set_etag(matched or etag)
+        # Let browsers keep the body but revalidate on every fetch
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
+
+@functools.lru_cache(maxsize=None)
+def _static_mtime(filename: str) -> Optional[int]:
+    try:
+        return int(os.stat(os.path.join(app.static_folder, filename)).st_mtime)
+    except OSError:
+        return None
+
+@app.url_defaults
+def _static_version(endpoint, values):
+    """Add ?v=<mtime> to static URLs so a changed file gets a new URL."""
+    if endpoint == 'static' and 'filename' in values:
+        version = _static_mtime(values['filename'])
+        if version is not None:
+            values.setdefault('v', version)
+
+@app.after_request
+def _static_cache_control(response):
+    if request.endpoint == 'static' and response.status_code == 200:
+        if 'v' in request.args:
+            response.cache_control.public = True
+            response.cache_control.immutable = True
+        else:
+            # Unversioned URL: the max-age above would pin a stale copy
+            response.cache_control.no_cache = True
+    return response
+
 @app.route('/')
 def dashboard():
     stats = get_stats()
     return render_template('dashboard.html', stats=stats)
 
-@app.route('/api/metrics')
-def api_metrics():
-    """API endpoint for chart/table data."""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
-    c.execute('''
-        SELECT timestamp, backup_id, success, duration_total, duration_snapshot,
-               duration_archive, duration_volumes, duration_upload,
-               size_bytes, volume_bytes, error_category, error_message
-        FROM backups
-        ORDER BY timestamp DESC
+# Last 30 backups, oldest first, with MB/s rates computed by SQLite.
+# Column aliases are the /api/metrics JSON keys.
+METRICS_SQL = '''
+    SELECT timestamp, backup_id, success,
+           COALESCE(duration_total, 0) AS duration_total,
+           COALESCE(duration_snapshot, 0) AS duration_snapshot,
+           COALESCE(duration_archive, 0) AS duration_archive,
+           COALESCE(duration_volumes, 0) AS duration_volumes,
+           COALESCE(duration_upload, 0) AS duration_upload,
+           COALESCE(size_bytes, 0) AS size_bytes,
+           COALESCE(volume_bytes, 0) AS volume_bytes,
+           ROUND(CASE WHEN duration_total > 0
+               THEN size_bytes * 1.0 / duration_total / 1048576.0 ELSE 0 END, 2) AS throughput_mb_per_sec,
+           ROUND(CASE WHEN duration_archive > 0
+               THEN size_bytes * 1.0 / duration_archive / 1048576.0 ELSE 0 END, 2) AS archive_mb_per_sec,
+           ROUND(CASE WHEN duration_upload > 0
+               THEN size_bytes * 1.0 / duration_upload / 1048576.0 ELSE 0 END, 2) AS upload_mb_per_sec,
+           ROUND(CASE WHEN duration_volumes > 0
+               THEN COALESCE(volume_bytes, 0) * 1.0 / duration_volumes / 1048576.0 ELSE 0 END, 2) AS volumes_mb_per_sec,
+           error_category, error_message
+    FROM (
+        SELECT * FROM backups
+        ORDER BY ts_epoch DESC
         LIMIT 30
-    ''')
-
-    rows = c.fetchall()
-    conn.close()
+    )
+    ORDER BY ts_epoch ASC
+'''
 
-    metrics = []
-    for row in reversed(rows):
-        timestamp, backup_id = row[0], row[1]
-        success = row[2]
-        duration_total = row[3] or 0
-        duration_archive = row[5] or 0
-        duration_volumes = row[6] or 0
-        duration_upload = row[7] or 0
-        size_bytes = row[8] or 0
-        volume_bytes = row[9] or 0
-
-        overall_mb_s = (size_bytes / duration_total / 1024 / 1024) if duration_total > 0 else 0
-        archive_mb_s = (size_bytes / duration_archive / 1024 / 1024) if duration_archive > 0 else 0
-        upload_mb_s = (size_bytes / duration_upload / 1024 / 1024) if duration_upload > 0 else 0
-        volumes_mb_s = (volume_bytes / duration_volumes / 1024 / 1024) if duration_volumes > 0 else 0
-
-        metrics.append({
-            'timestamp': timestamp,
-            'backup_id': backup_id,
-            'success': bool(success),
-            'duration_total': duration_total,
-            'duration_snapshot': row[4] or 0,
-            'duration_archive': duration_archive,
-            'duration_volumes': duration_volumes,
-            'duration_upload': duration_upload,
-            'size_bytes': size_bytes,
-            'volume_bytes': volume_bytes,
-            'throughput_mb_per_sec': round(overall_mb_s, 2),
-            'archive_mb_per_sec': round(archive_mb_s, 2),
-            'upload_mb_per_sec': round(upload_mb_s, 2),
-            'volumes_mb_per_sec': round(volumes_mb_s, 2),
-            'error_category': row[10],
-            'error_message': row[11]
-        })
-
-    return jsonify(metrics)
+@app.route('/api/metrics')
+@cached_json
+def api_metrics():
+    """API endpoint for chart/table data, streamed as a JSON array row by row."""
+    c = get_ro_conn().cursor()
+    c.execute(METRICS_SQL)
+
+    def generate():
+        # Iterate the cursor directly; no intermediate list of rows or dicts
+        sep = b'['
+        for row in c:
+            yield sep + json_dumps(dict(row, success=bool(row['success'])))
+            sep = b','
+        yield b']' if sep == b',' else b'[]'
+
+    return app.response_class(generate(), mimetype='application/json')
+
+FAILURES_SQL = '''
+    SELECT timestamp, backup_id,
+           COALESCE(NULLIF(error_category, ''), 'unknown') AS error_category,
+           error_message
+    FROM backups
+    WHERE success = 0
+    ORDER BY ts_epoch DESC
+    LIMIT 10
+'''
 
 @app.route('/api/failures')
+@cached_json
 def api_failures():
     """API endpoint for recent failures."""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+    c = get_ro_conn().cursor()
 
-    c.execute('''
-        SELECT timestamp, backup_id, error_category, error_message
-        FROM backups
-        WHERE success = 0
-        ORDER BY timestamp DESC
-        LIMIT 10
-    ''')
+    c.execute(FAILURES_SQL)
 
-    rows = c.fetchall()
-    conn.close()
+    failures = [dict(row) for row in c.fetchall()]
 
-    failures = [{
-        'timestamp': row[0],
-        'backup_id': row[1],
-        'error_category': row[2] or 'unknown',
-        'error_message': row[3]
-    } for row in rows]
+    return json_response(failures)
 
-    return jsonify(failures)
+TRENDS_SQL = '''
+    SELECT
+        week,
+        error_category,
+        COUNT(*) as count
+    FROM backups
+    WHERE success = 0 AND ts_epoch >= ?
+    GROUP BY week, error_category
+    ORDER BY week
+'''
 
 @app.route('/api/failure-trends')
+@cached_json
 def api_failure_trends():
     """API endpoint for failure trends by category per week."""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+    c = get_ro_conn().cursor()
 
-    thirty_days_ago = (datetime.now() - timedelta(days=30)).isoformat()
+    thirty_days_ago = Windows.compute().thirty_day_epoch
 
-    c.execute('''
-        SELECT
-            strftime('%Y-%W', timestamp) as week,
-            error_category,
-            COUNT(*) as count
-        FROM backups
-        WHERE success = 0 AND timestamp >= ?
-        GROUP BY week, error_category
-        ORDER BY week
-    ''', (thirty_days_ago,))
+    c.execute(TRENDS_SQL, (thirty_days_ago,))
 
     rows = c.fetchall()
-    conn.close()
 
-    trends = [{'week': row[0], 'error_category': row[1] or 'unknown', 'count': row[2]} for row in rows]
-    return jsonify(trends)
+    trends = [{'week': row['week'], 'error_category': row['error_category'] or 'unknown', 'count': row['count']} for row in rows]
+    return json_response(trends)
 
 @app.route('/api/import', methods=['POST'])
 def api_import():
-    inserted = import_metrics()
-    return jsonify({
-        'status': 'ok',
-        'imported_at': datetime.now().isoformat(),
-        'inserted': inserted
+    """Queue an import on the background writer and return immediately."""
+    request_import(IMPORT_REASON_MANUAL)
+    response = json_response({
+        'status': 'queued',
+        'queued_at': datetime.now().isoformat(),
     })
+    response.status_code = 202
+    return response
 
 @app.route('/health')
 def health():
-    return jsonify({'status': 'ok'})
+    return json_response({'status': 'ok'})
 
 # ----------------------------
 # Background importer
 # ----------------------------
+# Seconds the metrics file must stay quiet after a change before importing
+IMPORT_DEBOUNCE_SECONDS = 2
+
+IMPORT_REASON_WATCH = 'watch'
+IMPORT_REASON_MANUAL = 'manual'
+
+# All DB writes happen on the periodic_import() thread. Other threads (file
+# watcher, /api/import) only enqueue a request; a full queue already has an
+# import pending, so extra requests are dropped.
+writer_q = queue.Queue(maxsize=4)
+
+def request_import(reason: str):
+    try:
+        writer_q.put_nowait(reason)
+    except queue.Full:
+        pass
+
+def _drain_writer_queue() -> set:
+    reasons = set()
+    while True:
+        try:
+            reasons.add(writer_q.get_nowait())
+        except queue.Empty:
+            return reasons
+
+def _wait_for_import_request():
+    """Block until an import is requested or IMPORT_INTERVAL_SECONDS passes."""
+    try:
+        reasons = {writer_q.get(timeout=IMPORT_INTERVAL_SECONDS)}
+    except queue.Empty:
+        return
+    reasons |= _drain_writer_queue()
+
+    # File changes arrive in bursts while a backup appends; wait for writes to
+    # settle so one backup run = one import. Manual requests skip the wait.
+    while IMPORT_REASON_MANUAL not in reasons:
+        time.sleep(IMPORT_DEBOUNCE_SECONDS)
+        more = _drain_writer_queue()
+        if not more:
+            return
+        reasons |= more
+
 def periodic_import():
     while True:
         try:
             print(f"[{datetime.now().isoformat()}] Running periodic metrics import...")
             inserted = import_metrics()
             print(f"[{datetime.now().isoformat()}] Metrics import completed (inserted={inserted})")
+            deleted = retention_sweep()
+            if deleted:
+                print(f"[{datetime.now().isoformat()}] Retention sweep removed {deleted} records older than {RETENTION_DAYS} days")
         except Exception as e:
             print(f"[{datetime.now().isoformat()}] Error during periodic import: {e}")
-        time.sleep(IMPORT_INTERVAL_SECONDS)
 
-if __name__ == '__main__':
+        _wait_for_import_request()
+
+class _MetricsFileHandler(FileSystemEventHandler):
+    """Wakes the importer when METRICS_FILE is written, created or moved into place."""
+
+    def __init__(self):
+        super().__init__()
+        self._path = os.path.abspath(METRICS_FILE)
+
+    def on_any_event(self, event):
+        if event.event_type not in ('modified', 'created', 'moved', 'closed'):
+            return
+        paths = (event.src_path, getattr(event, 'dest_path', ''))
+        if any(p and os.path.abspath(os.fsdecode(p)) == self._path for p in paths):
+            request_import(IMPORT_REASON_WATCH)
+
+def start_metrics_watcher() -> bool:
+    """Watch METRICS_FILE for changes. Returns False if watchdog isn't installed,
+    in which case periodic_import() falls back to plain interval polling."""
+    if Observer is None:
+        return False
+    observer = Observer()
+    observer.daemon = True
+    observer.schedule(_MetricsFileHandler(), os.path.dirname(os.path.abspath(METRICS_FILE)), recursive=False)
+    observer.start()
+    return True
+
+_started = False
+_start_lock = threading.Lock()
+
+def start_background():
+    """Initialize the DB and start the importer thread and file watcher.
+
+    Safe to call more than once; only the first call in a process does anything.
+    Called from wsgi.py under gunicorn and from __main__ for the dev server.
+    """
+    global _started
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+
     print("=" * 60)
     print("Backup Monitor Configuration:")
     print(f"  Database:        {DB_PATH}")
@@ -425,10 +1055,18 @@ if __name__ == '__main__':
     print("=" * 60)
 
     init_db()
-    import_metrics()
 
+    # The thread runs its first import immediately
     import_thread = threading.Thread(target=periodic_import, daemon=True)
     import_thread.start()
     print(f"Started periodic import thread (every {IMPORT_INTERVAL_SECONDS / 3600} hours)")
 
+    if start_metrics_watcher():
+        print(f"Watching {METRICS_FILE} for changes")
+    else:
+        print("watchdog not installed; relying on periodic import only")
+
+if __name__ == '__main__':
+    # Development server; the container runs gunicorn via wsgi.py
+    start_background()
     app.run(host='0.0.0.0', port=5001)
@@ -0,0 +1,11 @@
+"""
+WSGI entrypoint for production serving:
+
+    gunicorn -k gthread -w 1 --threads 8 -b 0.0.0.0:5001 wsgi:app
+"""
+
+from app import app, start_background
+
+__all__ = ['app']  # the gunicorn target
+
+start_background()